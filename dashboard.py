@@ -7,6 +7,17 @@ from datetime import datetime, timedelta
 import os
 import time
 import base64
+import hashlib
+import pickle
+import threading
+import psutil
+import json
+import math
+
+# Copy-on-Write：從共用資料集切出的子集與淺複製共用同一份資料，寫入時才各自複製
+# (寫入不會被阻擋，只是不會影響共用資料集)；pandas 3 起 CoW 恆為開啟，此選項已棄用
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
 
 # --- 0. 全域設定 ---
 st.set_page_config(
@@ -79,6 +90,10 @@ st.markdown("""
 
 # --- 1. 核心邏輯：情緒計分引擎 (V15.0 競品黑名單強化版) ---
 class SentimentEngine:
+    # 計分邏輯版本：修改 tokenize()/score() (門檻、推噓基礎分、快篩順序等) 時請遞增，
+    # 已持久化的情緒索引會因此整批重建
+    SCORER_VERSION = 1
+
     def __init__(self):
         # 1. [絕對語意] 出現即定調 (優先級最高)
         self.deadly_negative_patterns = [
@@ -121,7 +136,32 @@ class SentimentEngine:
         
         self.negation_words = ['不', '沒', '無', '非', '別', '不會', '不用', '不太']
 
-    def analyze(self, text):
+    def rules(self):
+        """目前規則快照，供增量重算比對新舊規則。"""
+        return {
+            "deadly": frozenset(self.deadly_negative_patterns),
+            "super": frozenset(self.super_positive_patterns),
+            "neg": dict(self.neg_words),
+            "pos": dict(self.pos_words),
+            "negation": frozenset(self.negation_words),
+            "scorer": self.SCORER_VERSION,
+        }
+
+    def fingerprint(self):
+        r = self.rules()
+        raw = repr((r["scorer"], sorted(r["deadly"]), sorted(r["super"]), sorted(r["neg"].items()),
+                    sorted(r["pos"].items()), sorted(r["negation"])))
+        return hashlib.md5(raw.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def strip_tags(text):
+        return text.replace("[推]", "").replace("[噓]", "").replace("[→]", "").replace("[標題]", "")
+
+    def tokenize(self, text):
+        return jieba.lcut(self.strip_tags(text))
+
+    def score(self, text, words):
+        """以預先斷詞的結果判定情緒 (增量重算時免再跑 jieba)。"""
         if not isinstance(text, str): return "中性"
         text = text.strip()
         
@@ -136,11 +176,8 @@ class SentimentEngine:
         if "[推]" in text: base_score += 1
         if "[噓]" in text: base_score -= 4
         
-        clean_text = text.replace("[推]", "").replace("[噓]", "").replace("[→]", "").replace("[標題]", "")
-        
         # 3. 關鍵字計分
         score = base_score
-        words = jieba.lcut(clean_text)
         
         for i, word in enumerate(words):
             word_score = 0
@@ -157,8 +194,189 @@ class SentimentEngine:
         elif score >= 2: return "正面"
         else: return "中性"
 
+    def analyze(self, text):
+        if not isinstance(text, str): return "中性"
+        return self.score(text, self.tokenize(text.strip()))
+
+# --- 1.1 增量重算索引 (詞彙/句型 → 資料列) ---
+class SentimentIndex:
+    """
+    持久化的 詞彙→資料列 索引。
+    規則調整時只比對新舊規則差異，並僅重算含有異動詞彙或句型的資料列。
+    資料列以 content 為鍵 (與爬蟲的去重鍵一致)。
+    """
+    def __init__(self, path="sentiment_index.pkl"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.rules = None
+        self.tokens = {}        # content -> 斷詞結果
+        self.labels = {}        # content -> 情緒標籤
+        self.term_rows = {}     # 斷詞 -> {content}
+        self.pattern_rows = {}  # 絕對句型 -> {content}
+        self.last_diff = None   # 最近一次規則異動的重算摘要
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path): return
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+            self.rules = state["rules"]
+            self.tokens = state["tokens"]
+            self.labels = state["labels"]
+            self.term_rows = state["term_rows"]
+            self.pattern_rows = state["pattern_rows"]
+            self.last_diff = state.get("last_diff")
+        except Exception:
+            # 索引毀損時重建，不影響主流程
+            self.rules = None
+            self.tokens, self.labels, self.term_rows, self.pattern_rows = {}, {}, {}, {}
+
+    def _save(self):
+        state = {
+            "rules": self.rules, "tokens": self.tokens, "labels": self.labels,
+            "term_rows": self.term_rows, "pattern_rows": self.pattern_rows,
+            "last_diff": self.last_diff,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.path)
+
+    def _rows_with_pattern(self, pattern):
+        if pattern not in self.pattern_rows:
+            self.pattern_rows[pattern] = {c for c in self.labels if pattern in c}
+        return self.pattern_rows[pattern]
+
+    def _add_row(self, engine, content):
+        words = engine.tokenize(content.strip())
+        self.tokens[content] = words
+        self.labels[content] = engine.score(content, words)
+        for w in set(words):
+            self.term_rows.setdefault(w, set()).add(content)
+        for pattern, rows in self.pattern_rows.items():
+            if pattern in content: rows.add(content)
+
+    def _drop_row(self, content):
+        for w in set(self.tokens.pop(content, [])):
+            rows = self.term_rows.get(w)
+            if rows is not None:
+                rows.discard(content)
+                if not rows: del self.term_rows[w]
+        for rows in self.pattern_rows.values():
+            rows.discard(content)
+        self.labels.pop(content, None)
+
+    def _apply_rules(self, engine, new_rules):
+        old = self.rules
+        if old is None:
+            # 首次建立索引：尚無舊規則可比對，資料列會在加入時以現行規則計分
+            self.rules = new_rules
+            return
+
+        t0 = time.perf_counter()
+        changed_patterns = (old["deadly"] ^ new_rules["deadly"]) | (old["super"] ^ new_rules["super"])
+        changed_terms = {
+            w for w in set(old["neg"]) | set(new_rules["neg"]) | set(old["pos"]) | set(new_rules["pos"])
+            if old["neg"].get(w) != new_rules["neg"].get(w) or old["pos"].get(w) != new_rules["pos"].get(w)
+        }
+        changed_terms |= old["negation"] ^ new_rules["negation"]
+
+        affected = set()
+        for term in changed_terms:
+            affected |= self.term_rows.get(term, set())
+        for pattern in changed_patterns:
+            affected |= self._rows_with_pattern(pattern)
+
+        before = {"正面": 0, "負面": 0, "中性": 0}
+        after = dict(before)
+        flips = {}
+        for content in affected:
+            old_label = self.labels[content]
+            new_label = engine.score(content, self.tokens[content])
+            before[old_label] += 1
+            after[new_label] += 1
+            if new_label != old_label:
+                key = f"{old_label}→{new_label}"
+                flips[key] = flips.get(key, 0) + 1
+            self.labels[content] = new_label
+
+        # 只保留現行規則的句型索引，移除的句型已完成重算
+        current_patterns = new_rules["deadly"] | new_rules["super"]
+        for pattern in list(self.pattern_rows):
+            if pattern not in current_patterns: del self.pattern_rows[pattern]
+
+        self.rules = new_rules
+        self.last_diff = {
+            "at": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "changed": sorted(changed_terms | changed_patterns),
+            "rescored": len(affected),
+            "before": before,
+            "after": after,
+            "flips": flips,
+            "rescore_ms": (time.perf_counter() - t0) * 1000,
+        }
+
+    def labels_for(self, engine, contents):
+        """回傳每筆 content 的情緒標籤；新資料才斷詞，規則異動只重算受影響列。"""
+        with self.lock:
+            dirty = False
+            keys = {c for c in contents if isinstance(c, str)}
+            new_rules = engine.rules()
+
+            # 計分邏輯改版：快取的斷詞與標籤都不可信，整批重建
+            if self.rules is not None and self.rules.get("scorer") != new_rules["scorer"]:
+                self.rules = None
+                self.tokens, self.labels, self.term_rows, self.pattern_rows = {}, {}, {}, {}
+                self.last_diff = None
+
+            for content in self.labels.keys() - keys:
+                self._drop_row(content)
+                dirty = True
+
+            # 先對既有資料套用規則差異，翻轉統計才不會混入新資料
+            if new_rules != self.rules:
+                self._apply_rules(engine, new_rules)
+                dirty = True
+
+            for content in keys - self.labels.keys():
+                self._add_row(engine, content)
+                dirty = True
+
+            for pattern in new_rules["deadly"] | new_rules["super"]:
+                if pattern not in self.pattern_rows:
+                    self._rows_with_pattern(pattern)
+                    dirty = True
+
+            if dirty: self._save()
+            return [self.labels.get(c, "中性") if isinstance(c, str) else "中性" for c in contents]
+
 sentiment_engine = SentimentEngine()
 
+@st.cache_resource
+def get_sentiment_index():
+    return SentimentIndex()
+
+# --- 1.2 關鍵詞萃取 (關鍵字對決與異常告警共用) ---
+# 🚨【關鍵修正】停用詞大清洗：濾除「這種」、「那個」、「比較」等無意義詞
+STOP_WORDS = set([
+    "高雄", "義享", "天地", "百貨", "巨蛋", "感覺", "比較", "真的", "現在", "今天", "時候", "知道", "看到", 
+    "有的", "沒有", "什麼", "可以", "一個", "就是", "還是", "我們", "你們", "因為", "可能", "其實", "覺得", 
+    "不過", "這個", "那個", "去過", "大家", "請問", "問題", "閒聊", "新聞", "分享", "文章", "作者", "標題", 
+    "時間", "原本", "以為", "結果", "部分", "目前", "已經", "怎麼", "這樣", "最近", "這家", "這種", "那種",
+    "一樣", "一點", "一下", "一直", "只是", "但是", "然後", "還有", "只是", "甚至", "而且", "不如", "如果"
+])
+if os.path.exists("stop_words.txt"):
+    with open("stop_words.txt", "r", encoding="utf-8") as f:
+        for line in f: STOP_WORDS.add(line.strip())
+
+def extract_keywords(texts, top_n):
+    """去除 [標題]/[推]/[噓] 標記後萃取關鍵詞，並濾除停用詞。"""
+    full = " ".join(SentimentEngine.strip_tags(str(t)) for t in texts)
+    tags = jieba.analyse.extract_tags(full, topK=80, withWeight=True)
+    filtered = [(w, s) for w, s in tags if w not in STOP_WORDS and len(w)>1 and not w.isdigit()]
+    return filtered[:top_n]
+
 # --- 2. 數據處理 ---
 def solve_future_date_issue(df):
     now = datetime.now()
@@ -173,8 +391,17 @@ def solve_future_date_issue(df):
     df['date'] = df['date'].apply(adjust_date)
     return df
 
-@st.cache_data(ttl=60)
-def load_data(csv_path="my_data.csv"):
+def get_data_generation(csv_path="my_data.csv"):
+    """資料版本：以 CSV 的修改時間與大小標記，爬蟲寫檔後即換新版本。"""
+    if not os.path.exists(csv_path): return "empty"
+    stat = os.stat(csv_path)
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+# 整個伺服器行程只保留一份資料集 (不序列化、不複製)，所有 session 共用同一物件；
+# max_entries=1：資料或規則換版後，舊版本即釋放
+@st.cache_resource(max_entries=1)
+def load_data(csv_path="my_data.csv", generation="", rules_key=""):
+    # generation: 資料版本；rules_key: 規則指紋，規則一改即觸發增量重算
     if not os.path.exists(csv_path):
         return pd.DataFrame(columns=['date', 'source', 'content', 'link', 'sentiment'])
     df = pd.read_csv(csv_path)
@@ -187,9 +414,177 @@ def load_data(csv_path="my_data.csv"):
     df = df.dropna(subset=['date'])
     df = solve_future_date_issue(df)
     
-    # 使用 V15 引擎重新計算
-    df['sentiment'] = df['content'].apply(sentiment_engine.analyze)
-    return df
+    # 使用 V15 引擎計算 (透過索引：只重算新資料與受規則異動影響的列)
+    df['sentiment'] = get_sentiment_index().labels_for(sentiment_engine, df['content'].tolist())
+
+    # 文字欄位改存 Arrow 連續緩衝區，比 Python 物件省記憶體且不可變
+    text_cols = ['source', 'content', 'link', 'sentiment']
+    df = df.astype({c: 'string[pyarrow]' for c in text_cols if c in df.columns})
+    return df.reset_index(drop=True)
+
+# --- 2.1 記憶體監控 ---
+@st.cache_resource
+def get_session_registry():
+    return {"lock": threading.Lock(), "sessions": {}}
+
+def track_session(idle_seconds=300):
+    """登記目前 session 並回傳近期仍活躍的 session 數。"""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx()
+    registry = get_session_registry()
+    now = time.time()
+    with registry["lock"]:
+        sessions = registry["sessions"]
+        if ctx is not None: sessions[ctx.session_id] = now
+        for sid, seen in list(sessions.items()):
+            if now - seen > idle_seconds: del sessions[sid]
+        return max(len(sessions), 1)
+
+def get_process_rss_mb():
+    return psutil.Process().memory_info().rss / 1024 ** 2
+
+# --- 2.2 聲量異常偵測 (串流 EWMA 基準) ---
+class SpikeDetector:
+    """
+    逐筆消化新進資料，為每個 (來源, 情緒) 維護每日聲量的 EWMA 平均與變異數。
+    每筆更新為 O(1)，狀態 (含已消化的 content 與資料版本) 持久化，不需每次重掃全部歷史；
+    當日聲量超出基準 z 分數門檻時寫入告警表。
+    """
+    def __init__(self, state_path="spike_state.json", alerts_path="alerts.csv",
+                 alpha=0.1, z_threshold=3.0, min_count=5, warmup_days=7,
+                 alert_sentiments=("負面",)):
+        self.state_path = state_path
+        self.alerts_path = alerts_path
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_count = min_count
+        self.warmup_days = warmup_days
+        self.alert_sentiments = alert_sentiments
+        self.lock = threading.Lock()
+        self.keys = {}
+        self.seen = set()        # 已消化 content 的摘要 (固定長度，不存原文)
+        self.generation = None   # 最近一次消化的資料版本
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.state_path): return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            self.keys = state["keys"]
+            if "seen_digests" in state:
+                self.seen = set(state["seen_digests"])
+            else:
+                # 舊版狀態存的是原文，轉為摘要以免重複消化
+                self.seen = {self._digest(c) for c in state["seen"]}
+            self.generation = state.get("generation")
+        except Exception:
+            self.keys, self.seen, self.generation = {}, set(), None
+
+    def _save(self):
+        tmp_path = self.state_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"keys": self.keys, "seen_digests": list(self.seen), "generation": self.generation},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, self.state_path)
+
+    @staticmethod
+    def _digest(content):
+        return hashlib.md5(str(content).encode("utf-8")).hexdigest()[:16]
+
+    def _push_day(self, st_key, count):
+        # EWMA 平均/變異數的增量更新
+        diff = count - st_key["mean"]
+        incr = self.alpha * diff
+        st_key["mean"] += incr
+        st_key["var"] = (1 - self.alpha) * (st_key["var"] + diff * incr)
+        st_key["days"] += 1
+
+    def _close_day(self, st_key, new_day):
+        self._push_day(st_key, st_key["count"])
+        # 中間無資料的日子以 0 篇計入；超過 60 天後基準已衰減殆盡，不再逐日迭代
+        gap = (datetime.fromisoformat(new_day) - datetime.fromisoformat(st_key["day"])).days - 1
+        for _ in range(min(gap, 60)):
+            self._push_day(st_key, 0)
+        st_key.update(day=new_day, count=0, alerted=False, texts=[])
+
+    def _update(self, key, day, source, sentiment, content):
+        st_key = self.keys.get(key)
+        if st_key is None:
+            st_key = self.keys[key] = {"day": day, "count": 0, "mean": 0.0, "var": 0.0,
+                                       "days": 0, "alerted": False, "texts": []}
+        # 遲到的舊日期資料不回溯修改基準
+        if day < st_key["day"]: return None
+        if day > st_key["day"]: self._close_day(st_key, day)
+
+        st_key["count"] += 1
+        if len(st_key["texts"]) < 200: st_key["texts"].append(content)
+
+        if sentiment not in self.alert_sentiments or st_key["alerted"]: return None
+        if st_key["days"] < self.warmup_days or st_key["count"] < self.min_count: return None
+        z = (st_key["count"] - st_key["mean"]) / math.sqrt(st_key["var"] + 1)
+        if z < self.z_threshold: return None
+
+        st_key["alerted"] = True
+        # 同日同情緒已有單一來源告警時，全來源彙總不再重複告警
+        if source == "全部" and any(
+                k.endswith(f"|{sentiment}") and not k.startswith("全部|") and v["day"] == day and v["alerted"]
+                for k, v in self.keys.items()):
+            return None
+        keywords = [w for w, _ in extract_keywords(st_key["texts"], 5)]
+        return {
+            "detected_at": datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "date": day,
+            "source": source,
+            "sentiment": sentiment,
+            "count": st_key["count"],
+            "baseline": round(st_key["mean"], 2),
+            "z": round(z, 2),
+            "keywords": "、".join(keywords),
+        }
+
+    def consume(self, df, generation):
+        """
+        消化 df (需含 date/source/content/sentiment 欄) 中尚未見過的資料列，回傳新告警。
+        不論資料由儀表板或直接執行爬蟲寫入 CSV 都會被接收；首次執行即以完整歷史建立基準。
+        """
+        with self.lock:
+            # 同一資料版本已處理過 (含其他 session 同時冷啟動的情況)
+            if generation == self.generation: return []
+            rows = df.dropna(subset=['date', 'content'])
+            rows = rows.assign(digest=rows['content'].map(self._digest))
+            rows = rows[~rows['digest'].isin(self.seen)]
+            rows = rows.drop_duplicates(subset=['digest'], keep='last').sort_values('date')
+
+            alerts = []
+            for date, source, sentiment, content, digest in zip(
+                    rows['date'], rows['source'], rows['sentiment'], rows['content'], rows['digest']):
+                day = pd.Timestamp(date).strftime("%Y-%m-%d")
+                # 個別來源與全來源彙總各自維護基準
+                for src in (source, "全部"):
+                    alert = self._update(f"{src}|{sentiment}", day, src, sentiment, str(content))
+                    if alert: alerts.append(alert)
+                self.seen.add(digest)
+
+            self.generation = generation
+            self._save()
+            if alerts:
+                alert_df = pd.DataFrame(alerts)
+                write_header = not os.path.exists(self.alerts_path)
+                alert_df.to_csv(self.alerts_path, mode='a', header=write_header, index=False, encoding='utf-8-sig')
+            return alerts
+
+    def recent_alerts(self, since):
+        if not os.path.exists(self.alerts_path):
+            return pd.DataFrame()
+        alert_df = pd.read_csv(self.alerts_path)
+        alert_df['keywords'] = alert_df['keywords'].fillna("")
+        alert_df = alert_df[pd.to_datetime(alert_df['date']) >= pd.Timestamp(since)]
+        return alert_df.sort_values(['date', 'z'], ascending=False)
+
+@st.cache_resource
+def get_spike_detector():
+    return SpikeDetector()
 
 # --- 3. 爬蟲整合 (已修復：解決 NoneType 錯誤) ---
 def run_spider_pipeline():
@@ -203,11 +598,10 @@ def run_spider_pipeline():
             # 2. 初始化爬蟲類別
             bot = spider_module.EskyHistorySpiderV10()
             
-            # 🚨【關鍵修正】強制啟動瀏覽器驅動程式 (Driver)
-            # 這行代碼解決了 'NoneType' object has no attribute 'get' 的問題
-            bot.driver = bot._init_selenium()
+            # 瀏覽器改為按需啟動：Mobile01 先走 HTTP 快速通道，
+            # 只有遇到驗證頁才開 Chrome；Dcard 仍由爬蟲自行初始化 Driver
             
-            # 3. 開始爬取 (瀏覽器視窗會跳出來，請勿關閉)
+            # 3. 開始爬取 (若瀏覽器視窗跳出來，請勿關閉)
             # 如果 Mobile01 遇到 Cloudflare 驗證，請手動在跳出的視窗點擊
             bot.crawl_ptt()
             bot.crawl_mobile01()
@@ -231,7 +625,9 @@ def run_spider_pipeline():
                 # 以內容去重 (避免重複推文)
                 final_df.drop_duplicates(subset=['content'], keep='last', inplace=True)
                 final_df.to_csv("my_data.csv", index=False, encoding='utf-8-sig')
-                st.success(f"✅ 更新成功！共收集 {len(new_data)} 筆新資料。")
+                stats = bot.fetch_stats
+                st.success(f"✅ 更新成功！共收集 {len(new_data)} 筆新資料。"
+                           f"（Mobile01：HTTP {stats['http']} 頁 / Selenium {stats['selenium']} 頁）")
                 time.sleep(2)
                 st.rerun()
             else:
@@ -347,10 +743,27 @@ with st.sidebar:
         run_spider_pipeline()
     st.markdown("---")
     
-    df = load_data()
+    data_generation = get_data_generation()
+    # 淺複製：Copy-on-Write 下不複製資料；本 session 若寫入會先複製一份，不影響其他 session 共用的資料集
+    df = load_data(generation=data_generation, rules_key=sentiment_engine.fingerprint()).copy(deep=False)
+
+    rule_diff = get_sentiment_index().last_diff
+    if rule_diff:
+        with st.expander(f"🔁 規則更新：重算 {rule_diff['rescored']} 筆"):
+            st.caption(f"{rule_diff['at']}｜差異重算 {rule_diff.get('rescore_ms', 0):.1f} ms (不含讀檔與索引存檔)")
+            st.caption("異動詞彙：" + "、".join(rule_diff['changed'][:20]))
+            flip_df = pd.DataFrame({"更新前": rule_diff['before'], "更新後": rule_diff['after']})
+            st.dataframe(flip_df)
+            total_flips = sum(rule_diff['flips'].values())
+            st.caption(f"標籤翻轉 {total_flips} 筆：" +
+                       "、".join(f"{k} {v}" for k, v in rule_diff['flips'].items()))
     if df.empty:
         st.warning("⚠️ 暫無數據")
         st.stop()
+
+    # 異常偵測只消化尚未見過的資料列 (首次啟用時即為完整歷史)
+    spike_detector = get_spike_detector()
+    spike_detector.consume(df, data_generation)
         
     min_date = df['date'].min().date()
     max_date = df['date'].max().date()
@@ -361,6 +774,15 @@ with st.sidebar:
     st.caption("📅 日期篩選")
     date_range = st.date_input("", [default_start, max_date])
 
+    st.markdown("---")
+    active_sessions = track_session()
+    rss_mb = get_process_rss_mb()
+    dataset_mb = df.memory_usage(deep=True).sum() / 1024 ** 2
+    # 平均值含共用資料集與直譯器本身，並非單一 session 額外佔用的記憶體
+    st.caption(f"🧠 常駐記憶體 {rss_mb:.0f} MB｜近 5 分鐘活躍連線 {active_sessions}")
+    st.caption(f"📦 共用資料集 {dataset_mb:.1f} MB｜平均每連線 {rss_mb / active_sessions:.0f} MB｜"
+               f"版本 {data_generation}")
+
 if isinstance(date_range, tuple) and len(date_range) == 2:
     start_dt, end_dt = date_range
     mask = (df['date'].dt.date >= start_dt) & (df['date'].dt.date <= end_dt)
@@ -392,6 +814,20 @@ st.markdown(f"""
     </div>
 """, unsafe_allow_html=True)
 
+# 聲量異常告警 (最近 7 天)
+recent_alerts = spike_detector.recent_alerts(df['date'].max() - timedelta(days=7))
+if not recent_alerts.empty:
+    # 同一天同情緒只顯示一則，優先顯示單一來源
+    recent_alerts = (recent_alerts.assign(is_total=recent_alerts['source'] == "全部")
+                     .sort_values(['date', 'is_total', 'z'], ascending=[False, True, False])
+                     .drop_duplicates(subset=['date', 'sentiment']))
+    alert_lines = [
+        f"**{a['date']}｜{a['source']}｜{a['sentiment']}聲量 {a['count']} 篇** "
+        f"(基準 {a['baseline']}，z={a['z']})｜關鍵詞：{a['keywords']}"
+        for a in recent_alerts.head(5).to_dict('records')
+    ]
+    st.error("🚨 聲量異常告警\n\n" + "\n\n".join(alert_lines))
+
 st.markdown("---")
 
 # KPI
@@ -427,24 +863,9 @@ with t1:
 
 with t2:
     c_neg, c_pos = st.columns(2)
-    
-    # 🚨【關鍵修正】停用詞大清洗：濾除「這種」、「那個」、「比較」等無意義詞
-    stop_words = set([
-        "高雄", "義享", "天地", "百貨", "巨蛋", "感覺", "比較", "真的", "現在", "今天", "時候", "知道", "看到", 
-        "有的", "沒有", "什麼", "可以", "一個", "就是", "還是", "我們", "你們", "因為", "可能", "其實", "覺得", 
-        "不過", "這個", "那個", "去過", "大家", "請問", "問題", "閒聊", "新聞", "分享", "文章", "作者", "標題", 
-        "時間", "原本", "以為", "結果", "部分", "目前", "已經", "怎麼", "這樣", "最近", "這家", "這種", "那種",
-        "一樣", "一點", "一下", "一直", "只是", "但是", "然後", "還有", "只是", "甚至", "而且", "不如", "如果"
-    ])
-    if os.path.exists("stop_words.txt"):
-        with open("stop_words.txt", "r", encoding="utf-8") as f:
-            for line in f: stop_words.add(line.strip())
 
     def get_kw_df(texts):
-        full = " ".join([str(t) for t in texts])
-        tags = jieba.analyse.extract_tags(full, topK=80, withWeight=True)
-        filtered = [(w, s) for w, s in tags if w not in stop_words and len(w)>1 and not w.isdigit()]
-        return pd.DataFrame(filtered[:8], columns=['關鍵詞', '權重'])
+        return pd.DataFrame(extract_keywords(texts, 8), columns=['關鍵詞', '權重'])
 
     with c_neg:
         st.markdown("#### 😡 負面痛點")
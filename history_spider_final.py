@@ -6,6 +6,7 @@ Key Upgrades:
     - PTT Comment Mining: Extracts all pushes/comments as individual data points.
     - Data Explosion: 1 Post -> 50+ Data Points.
     - Robust Error Handling: Fixed previous 'href' errors.
+    - Mobile01 HTTP Fast Path: requests first, Selenium only for challenge pages.
 """
 
 import time
@@ -33,11 +34,18 @@ HEADERS = {
     "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 }
 
+# Cloudflare / 驗證頁特徵 (命中即改用 Selenium)
+CHALLENGE_MARKERS = ["Just a moment", "cf-challenge", "cf_chl_", "challenge-platform", "Attention Required"]
+
 class EskyHistorySpiderV10:
     def __init__(self):
         self.data_list = []
         self.driver = None
         self.processed_links = set()
+        # Mobile01 抓取路徑統計：http = requests 快速通道, selenium = 瀏覽器備援
+        self.fetch_stats = {"http": 0, "selenium": 0}
+        # 本輪是否已遇到 Mobile01 驗證頁 (遇到後其餘頁面直接走瀏覽器)
+        self.mobile01_challenged = False
 
     def _log(self, source, msg):
         print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] [{source}] {msg}")
@@ -157,48 +165,77 @@ class EskyHistorySpiderV10:
                         break
 
     # ==========================
-    # Module 2: Mobile01 (Standard)
+    # Module 2: Mobile01 (HTTP First, Selenium Fallback)
     # ==========================
-    def crawl_mobile01(self):
-        self._log("Mobile01", "Starting Selenium Crawl...")
+    def _is_challenge_page(self, res):
+        if res.status_code in (403, 429, 503): return True
+        head = res.text[:5000]
+        return any(marker in head for marker in CHALLENGE_MARKERS)
+
+    def _fetch_mobile01_page(self, session, url):
+        """先以 requests 取頁，遇到驗證頁或搜尋列表沒有任何一列時才升級為 Selenium。"""
+        if not self.mobile01_challenged:
+            try:
+                res = session.get(url, timeout=10)
+                if self._is_challenge_page(res):
+                    # 已被驗證頁擋下，本輪其餘頁面不再浪費 HTTP 往返
+                    self.mobile01_challenged = True
+                else:
+                    soup = BeautifulSoup(res.text, "html.parser")
+                    # 列表可能由前端渲染：HTTP 取不到任何一列時交給 Selenium 確認是否真的沒結果
+                    if soup.select(".c-searchTableList .c-listTableTr"):
+                        self.fetch_stats["http"] += 1
+                        return soup
+            except Exception as e:
+                self._log("Mobile01", f"HTTP Error, fallback to Selenium: {e}")
+
         if not self.driver: self.driver = self._init_selenium()
-        
-        for kw in TARGET_KEYWORDS:
-            base_search = f"https://www.mobile01.com/search.php?key={kw}&m=forum"
-            # 只抓前 3 頁
-            for page in range(1, 4):
-                url = f"{base_search}&p={page}"
-                self.driver.get(url)
-                time.sleep(3)
-                
-                soup = BeautifulSoup(self.driver.page_source, "html.parser")
-                items = soup.select(".c-searchTableList .c-listTableTr")
-                
-                if not items: break
-                
-                for item in items:
-                    try:
-                        t_div = item.select_one(".c-listTableTd-title a")
-                        d_div = item.select_one(".o-fNotes-date")
-                        if not t_div: continue
-                        
-                        link = "https://www.mobile01.com/" + t_div['href']
-                        if link in self.processed_links: continue
-                        
-                        title = t_div.text.strip()
-                        date_str = d_div.text.strip() if d_div else ""
-                        post_date = self._parse_fuzzy_date(date_str)
-                        
-                        if post_date and post_date < CUTOFF_DATE: continue
-                        
-                        self.data_list.append({
-                            "date": post_date.strftime("%Y-%m-%d") if post_date else "",
-                            "source": "Mobile01",
-                            "content": self._clean_text(title),
-                            "link": link
-                        })
-                        self.processed_links.add(link)
-                    except: continue
+        self.driver.get(url)
+        time.sleep(3)
+        self.fetch_stats["selenium"] += 1
+        return BeautifulSoup(self.driver.page_source, "html.parser")
+
+    def crawl_mobile01(self):
+        self._log("Mobile01", "Starting HTTP Crawl (Selenium fallback)...")
+
+        with requests.Session() as s:
+            s.headers.update(HEADERS)
+
+            for kw in TARGET_KEYWORDS:
+                base_search = f"https://www.mobile01.com/search.php?key={kw}&m=forum"
+                # 只抓前 3 頁
+                for page in range(1, 4):
+                    url = f"{base_search}&p={page}"
+                    soup = self._fetch_mobile01_page(s, url)
+                    items = soup.select(".c-searchTableList .c-listTableTr")
+
+                    if not items: break
+
+                    for item in items:
+                        try:
+                            t_div = item.select_one(".c-listTableTd-title a")
+                            d_div = item.select_one(".o-fNotes-date")
+                            if not t_div: continue
+
+                            link = "https://www.mobile01.com/" + t_div['href']
+                            if link in self.processed_links: continue
+
+                            title = t_div.text.strip()
+                            date_str = d_div.text.strip() if d_div else ""
+                            post_date = self._parse_fuzzy_date(date_str)
+
+                            if post_date and post_date < CUTOFF_DATE: continue
+
+                            self.data_list.append({
+                                "date": post_date.strftime("%Y-%m-%d") if post_date else "",
+                                "source": "Mobile01",
+                                "content": self._clean_text(title),
+                                "link": link
+                            })
+                            self.processed_links.add(link)
+                        except: continue
+
+        self._log("Mobile01", f"Pages fetched: HTTP={self.fetch_stats['http']}, Selenium={self.fetch_stats['selenium']}")
 
     # ==========================
     # Module 3: Dcard (Standard)